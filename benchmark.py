@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numba
+import numpy as np
+
+import acsiify as asc  # Before pygame: acsiify hides the pygame support prompt
+import pygame as pg
+
+RESOLUTIONS = [(640, 360), (1280, 720), (1920, 1080)]
+PIXEL_SIZES = [6, 12]
+COLOR_LEVELS = [8, 32]
+IMPORT_BUDGET_MS = 500  # Cold `import acsiify`, on top of interpreter startup
+
+
+def _synthetic_frame(width, height, seed=0):
+    """Creates a reproducible RGB test frame with gradients, shapes and noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[..., 0] = x[None, :]
+    frame[..., 1] = y[:, None]
+    frame[..., 2] = 255 - (x[None, :] + y[:, None]) / 2
+    frame = frame.astype(np.uint8)
+    for _ in range(8):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.circle(frame, center, int(rng.integers(height // 20, height // 4)), color, -1)
+    noise = rng.integers(-16, 17, frame.shape)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def _stats(samples):
+    """Summarizes timing samples in milliseconds."""
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'mean_ms': statistics.fmean(samples),
+        'runs': len(samples),
+    }
+
+
+def _time(fn, repeat):
+    """Runs fn once to warm up, then returns timing statistics of `repeat` runs in milliseconds."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return _stats(samples)
+
+
+def _time_import(repeat):
+    """Times `import acsiify` in fresh interpreters, minus the startup time of the interpreter itself."""
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return (time.perf_counter() - start) * 1000
+
+    samples = [run('import acsiify') - run('pass') for _ in range(repeat)]
+    return _stats(samples)
+
+
+def _warm_up_jit():
+    """Compiles the numba kernels so that JIT time never ends up in a measurement."""
+    frame = _synthetic_frame(16, 16)
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    for dither in (None, 'diffusion'):
+        asc._convert_grid(frame, gray, asc.Quantizer(16, 32, dither), 4, area_average=True)
+
+
+def _bench_case(width, height, pixel_size, color_lvl, repeat, encode_frames):
+    """Times every stage of the conversion for one configuration."""
+    converter = asc.acsiify
+    font, ascii_chars = converter.font, converter.ascii_chars
+    quantizer = asc.Quantizer(len(ascii_chars), color_lvl)
+    ordered = asc.Quantizer(len(ascii_chars), color_lvl, 'ordered')
+    diffusion = asc.Quantizer(len(ascii_chars), color_lvl, 'diffusion')
+
+    image = _synthetic_frame(width, height)
+    gray_image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    cache, _ = asc._create_palette(font, ascii_chars, color_lvl, 'pygame')
+    atlas, _ = asc._create_palette(font, ascii_chars, color_lvl, 'atlas')
+    char_grid, color_grid = asc._convert_grid(image, gray_image, quantizer, pixel_size)
+
+    def build_cache():
+        # A cold cache filled with every glyph the frame needs
+        fresh, _ = asc._create_palette(font, ascii_chars, color_lvl, 'pygame')
+        surface = pg.Surface((width, height))
+        asc._draw_converted_image(surface, char_grid, color_grid, fresh, ascii_chars, pixel_size)
+
+    surface = pg.Surface((width, height))
+    asc._draw_converted_image(surface, char_grid, color_grid, cache, ascii_chars, pixel_size)
+    rendered = cv2.transpose(pg.surfarray.array3d(surface))
+
+    stages = {
+        'palette_pygame': build_cache,
+        'palette_atlas': lambda: asc._create_palette(font, ascii_chars, color_lvl, 'atlas'),
+        'convert': lambda: asc._convert_grid(image, gray_image, quantizer, pixel_size),
+        'convert_area': lambda: asc._convert_grid(image, gray_image, quantizer, pixel_size, True),
+        'convert_ordered': lambda: asc._convert_grid(image, gray_image, ordered, pixel_size),
+        'convert_diffusion': lambda: asc._convert_grid(image, gray_image, diffusion, pixel_size),
+        'draw_pygame': lambda: asc._draw_converted_image(surface, char_grid, color_grid, cache, ascii_chars,
+                                                         pixel_size),
+        'draw_atlas': lambda: atlas.compose(char_grid, color_grid, height, width, pixel_size),
+        'copy': lambda: cv2.cvtColor(cv2.transpose(pg.surfarray.array3d(surface)), cv2.COLOR_RGB2BGR),
+    }
+    results = {name: _time(fn, repeat) for name, fn in stages.items()}
+
+    # Encoding is timed per frame over a short synthetic clip
+    frame = cv2.cvtColor(rendered, cv2.COLOR_RGB2BGR)
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = cv2.VideoWriter(os.path.join(tmp, 'bench.avi'), cv2.VideoWriter_fourcc(*'XVID'), 30,
+                                   (width, height))
+        recorder.write(frame)
+        samples = []
+        for i in range(encode_frames):
+            shifted = np.roll(frame, i * pixel_size, axis=1)
+            start = time.perf_counter()
+            recorder.write(shifted)
+            samples.append((time.perf_counter() - start) * 1000)
+        recorder.release()
+    results['encode'] = _stats(samples)
+    return results
+
+
+def run(resolutions=RESOLUTIONS, pixel_sizes=PIXEL_SIZES, color_levels=COLOR_LEVELS, repeat=5, encode_frames=10):
+    """
+    Benchmarks every stage for each combination of resolution, pixel size and color levels.
+
+    Returns:
+        dict: Environment metadata and one entry per (case, stage) with timings in milliseconds.
+    """
+
+    results = [{'case': 'startup', 'stage': 'import', **_time_import(repeat)}]
+    _warm_up_jit()
+    for width, height in resolutions:
+        for pixel_size in pixel_sizes:
+            for color_lvl in color_levels:
+                case = f"{width}x{height}_p{pixel_size}_c{color_lvl}"
+                print(f"\r{case}", end="", file=sys.stderr)
+                for stage, timing in _bench_case(width, height, pixel_size, color_lvl, repeat,
+                                                 encode_frames).items():
+                    results.append({'case': case, 'stage': stage, **timing})
+    print(file=sys.stderr)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'pygame': pg.version.ver,
+            'numba': numba.__version__,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.1):
+    """
+    Compares median timings against a baseline.
+
+    Returns:
+        list: (case, stage, baseline_ms, current_ms, ratio, regressed) for every entry present in both runs.
+    """
+
+    previous = {(r['case'], r['stage']): r['median_ms'] for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        key = (r['case'], r['stage'])
+        if key not in previous:
+            continue
+        ratio = r['median_ms'] / previous[key] if previous[key] else float('inf')
+        rows.append((r['case'], r['stage'], previous[key], r['median_ms'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the acsiify conversion stages.')
+    parser.add_argument('--output', default='bench_results.json', help='Where to write the JSON results.')
+    parser.add_argument('--baseline', help='Earlier results to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown reported as a regression (default: 0.1).')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'Maximum import time in milliseconds (default: {IMPORT_BUDGET_MS}).')
+    parser.add_argument('--quick', action='store_true', help='Only benchmark the smallest configuration.')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        current = run(RESOLUTIONS[:1], PIXEL_SIZES[:1], COLOR_LEVELS[:1], repeat=args.repeat)
+    else:
+        current = run(repeat=args.repeat)
+
+    with open(args.output, 'w') as f:
+        json.dump(current, f, indent=2)
+
+    for r in current['results']:
+        print(f"{r['case']:<22} {r['stage']:<18} {r['median_ms']:10.3f} ms")
+
+    status = 0
+    import_ms = current['results'][0]['median_ms']
+    if import_ms > args.import_budget:
+        print(f"\nImport takes {import_ms:.0f} ms, over the budget of {args.import_budget:.0f} ms")
+        status = 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.threshold)
+        regressions = [row for row in rows if row[5]]
+        print(f"\nCompared {len(rows)} entries with {args.baseline}:")
+        for case, stage, before, after, ratio, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{case:<22} {stage:<18} {before:10.3f} -> {after:10.3f} ms ({ratio:5.2f}x){flag}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
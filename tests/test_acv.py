@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+import pytest
+
+import acsiify
+from acsiify import AcvReader, AcvWriter
+
+
+def random_grids(count, rows=6, cols=9, seed=0):
+    """Returns char and color grids where every frame changes a few cells of the previous one."""
+    rng = np.random.default_rng(seed)
+    char_grid = rng.integers(0, 11, (rows, cols), dtype=np.uint8)
+    color_grid = rng.integers(0, 32, (rows, cols, 3), dtype=np.uint8)
+    grids = []
+    for _ in range(count):
+        changed = rng.random((rows, cols)) < 0.2
+        char_grid = np.where(changed, rng.integers(0, 11, (rows, cols)), char_grid).astype(np.uint8)
+        color_grid = np.where(changed[..., None], rng.integers(0, 32, (rows, cols, 3)), color_grid).astype(np.uint8)
+        grids.append((char_grid, color_grid))
+    return grids
+
+
+def write(path, grids, keyframe_interval=4):
+    rows, cols = grids[0][0].shape
+    with AcvWriter(path, rows, cols, ' .:-=+*#%@', 32, 25.0, keyframe_interval, {'pixel_size': 8}) as writer:
+        for char_grid, color_grid in grids:
+            writer.write(char_grid, color_grid)
+
+
+def test_round_trip_in_order(tmp_path):
+    path = str(tmp_path / 'clip.acv')
+    grids = random_grids(11)
+    write(path, grids)
+
+    with AcvReader(path) as reader:
+        assert len(reader) == 11
+        assert (reader.rows, reader.cols, reader.color_lvl, reader.fps) == (6, 9, 32, 25.0)
+        assert reader.ascii_chars == ' .:-=+*#%@'
+        assert reader.metadata['pixel_size'] == 8
+        for (char_grid, color_grid), (expected_chars, expected_colors) in zip(reader, grids):
+            np.testing.assert_array_equal(char_grid, expected_chars)
+            np.testing.assert_array_equal(color_grid, expected_colors)
+
+
+@pytest.mark.parametrize('keyframe_interval', [1, 3, 100])
+def test_random_access(tmp_path, keyframe_interval):
+    path = str(tmp_path / 'clip.acv')
+    grids = random_grids(10, seed=keyframe_interval)
+    write(path, grids, keyframe_interval)
+
+    with AcvReader(path) as reader:
+        # Backwards, across keyframes and repeated frames
+        for frame_index in [9, 0, 5, 5, 2, 8, 7, 3]:
+            char_grid, color_grid = reader.read(frame_index)
+            np.testing.assert_array_equal(char_grid, grids[frame_index][0])
+            np.testing.assert_array_equal(color_grid, grids[frame_index][1])
+
+
+def test_returned_grids_are_copies(tmp_path):
+    path = str(tmp_path / 'clip.acv')
+    grids = random_grids(3)
+    write(path, grids)
+
+    with AcvReader(path) as reader:
+        char_grid, _ = reader.read(0)
+        char_grid[:] = 0
+        np.testing.assert_array_equal(reader.read(1)[0], grids[1][0])
+
+
+def test_out_of_range(tmp_path):
+    path = str(tmp_path / 'clip.acv')
+    write(path, random_grids(2))
+    with AcvReader(path) as reader:
+        with pytest.raises(IndexError):
+            reader.read(2)
+        with pytest.raises(IndexError):
+            reader.read(-1)
+
+
+def test_wrong_shape(tmp_path):
+    with AcvWriter(str(tmp_path / 'clip.acv'), 2, 3, '@', 8, 30) as writer:
+        with pytest.raises(ValueError):
+            writer.write(np.zeros((3, 2), dtype=np.uint8), np.zeros((3, 2, 3), dtype=np.uint8))
+
+
+def test_not_an_acv_file(tmp_path):
+    path = tmp_path / 'clip.acv'
+    path.write_bytes(b'RIFF' + bytes(64))
+    with pytest.raises(ValueError, match='not an .acv file'):
+        AcvReader(str(path))
+
+
+def test_incomplete_file(tmp_path):
+    path = str(tmp_path / 'clip.acv')
+    writer = AcvWriter(path, 2, 3, '@', 8, 30)
+    writer.write(np.zeros((2, 3), dtype=np.uint8), np.zeros((2, 3, 3), dtype=np.uint8))
+    writer._file.flush()  # Interrupted before close() wrote the seek index
+    with pytest.raises(ValueError, match='incomplete'):
+        AcvReader(path)
+    writer.close()
+
+
+def test_record_matches_to_grid(tmp_path):
+    video_path = str(tmp_path / 'clip.avi')
+    rng = np.random.default_rng(0)
+    recorder = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for _ in range(5):
+        recorder.write(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    recorder.release()
+
+    converter = acsiify.Asciify(instrumentation=acsiify.Instrumentation())
+    acv_path = converter.record(video_path, str(tmp_path / 'clip.acv'), color_lvl=16, pixel_size=8,
+                                keyframe_interval=2)
+
+    capture = cv2.VideoCapture(video_path)
+    with AcvReader(acv_path) as reader:
+        assert len(reader) == 5
+        for char_grid, color_grid in reader:
+            ret, frame = capture.read()
+            assert ret
+            expected_chars, expected_colors = converter.to_grid(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), 16, 8)
+            np.testing.assert_array_equal(char_grid, expected_chars)
+            np.testing.assert_array_equal(color_grid, expected_colors)
+    capture.release()
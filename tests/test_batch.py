@@ -0,0 +1,62 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import acsiify
+
+
+def write_images(directory, names, size=(48, 64)):
+    rng = np.random.default_rng(0)
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        cv2.imwrite(os.path.join(directory, name), rng.integers(0, 256, size + (3,), dtype=np.uint8))
+
+
+@pytest.fixture
+def converter():
+    return acsiify.Asciify(instrumentation=acsiify.Instrumentation())
+
+
+def test_converts_into_output_dir(converter, tmp_path):
+    write_images(str(tmp_path / 'in'), ['a.png', 'b.jpg'])
+    summary = converter.batch(str(tmp_path / 'in'), output_dir=str(tmp_path / 'out'), pixel_size=8)
+    assert (summary['converted'], summary['skipped'], summary['failed']) == (2, 0, 0)
+    assert sorted(os.listdir(tmp_path / 'out')) == ['a_ascii.png', 'b_ascii.jpg']
+
+    # Up-to-date results are skipped unless forced
+    assert converter.batch(str(tmp_path / 'in'), output_dir=str(tmp_path / 'out'))['skipped'] == 2
+    assert converter.batch(str(tmp_path / 'in'), output_dir=str(tmp_path / 'out'), force=True)['converted'] == 2
+
+
+def test_colliding_outputs_raise_before_converting(converter, tmp_path):
+    write_images(str(tmp_path / 'a'), ['x.png'])
+    write_images(str(tmp_path / 'b'), ['x.png'])
+    with pytest.raises(ValueError, match='would both be saved as'):
+        converter.batch(str(tmp_path / '**' / '*.png'), output_dir=str(tmp_path / 'out'))
+    assert not os.path.exists(tmp_path / 'out')
+
+    # Next to their inputs they do not collide
+    assert converter.batch(str(tmp_path / '**' / '*.png'))['converted'] == 2
+
+
+def test_input_matched_twice_is_converted_once(converter, tmp_path):
+    write_images(str(tmp_path / 'in'), ['a.png'])
+    summary = converter.batch([str(tmp_path / 'in'), str(tmp_path / 'in' / 'a.png')],
+                              output_dir=str(tmp_path / 'out'))
+    assert summary['converted'] == 1
+
+
+class StopAfterFirst(acsiify.Instrumentation):
+    def on_progress(self, done, total, name):
+        raise KeyboardInterrupt
+
+
+def test_failing_loop_cancels_pending_images(tmp_path):
+    names = [f'{i:03d}.png' for i in range(48)]
+    write_images(str(tmp_path / 'in'), names, size=(240, 320))
+    converter = acsiify.Asciify(instrumentation=StopAfterFirst())
+    with pytest.raises(KeyboardInterrupt):
+        converter.batch(str(tmp_path / 'in'), output_dir=str(tmp_path / 'out'), pixel_size=4, workers=2)
+    assert len(os.listdir(tmp_path / 'out')) < len(names)
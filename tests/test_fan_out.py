@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+import acsiify
+from acsiify import _read_frames
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    """A 320x240 clip of 8 frames with moving gradients and noise."""
+    path = str(tmp_path_factory.mktemp('fan_out') / 'clip.avi')
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[:240, :320]
+    recorder = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (320, 240))
+    for i in range(8):
+        frame = np.stack([(x + 9 * i) % 256, (y * 2 + 5 * i) % 256, (x + y) % 256], axis=-1)
+        recorder.write(np.clip(frame + rng.integers(-30, 31, frame.shape), 0, 255).astype(np.uint8))
+    recorder.release()
+    return path
+
+
+def read_all(path):
+    capture = cv2.VideoCapture(path)
+    frames = list(_read_frames(capture))
+    capture.release()
+    return frames
+
+
+@pytest.mark.parametrize('renderer', ['pygame', 'atlas'])
+def test_fan_out_matches_separate_conversions(clip, tmp_path, renderer):
+    converter = acsiify.Asciify(instrumentation=acsiify.Instrumentation())
+    outputs = [
+        {'output_path': str(tmp_path / 'a.avi'), 'geometry': '240x180', 'pixel_size': 4, 'color_lvl': 8},
+        {'output_path': str(tmp_path / 'b.avi'), 'geometry': '120x90', 'pixel_size': 4, 'color_lvl': 8},
+        {'output_path': str(tmp_path / 'c.avi'), 'pixel_size': 6, 'color_lvl': 16},
+        {'output_path': str(tmp_path / 'd.avi'), 'geometry': '120x90', 'pixel_size': 6, 'color_lvl': 8},
+    ]
+    converter.fan_out(clip, outputs, renderer)
+
+    for output in outputs:
+        expected_path = str(tmp_path / 'expected.avi')
+        converter.video(clip, output['color_lvl'], output['pixel_size'], expected_path, output.get('geometry'),
+                        renderer=renderer)
+        frames, expected = read_all(output['output_path']), read_all(expected_path)
+        assert len(frames) == len(expected) == 8
+        for frame, expected_frame in zip(frames, expected):
+            np.testing.assert_array_equal(frame, expected_frame)
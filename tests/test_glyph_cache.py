@@ -0,0 +1,53 @@
+import pygame as pg
+import pytest
+
+import acsiify
+from acsiify import GlyphCache, _surface_nbytes
+
+
+@pytest.fixture(scope='module')
+def font():
+    return acsiify.Asciify(instrumentation=acsiify.Instrumentation()).font
+
+
+def glyph_bytes(font, char='@'):
+    return _surface_nbytes(font.render(char, False, (255, 255, 255)))
+
+
+def test_hits_and_misses(font):
+    cache = GlyphCache(font, 8)
+    first = cache.get('@', (1, 2, 3))
+    assert cache.get('@', (1, 2, 3)) is first
+    cache.get('#', (1, 2, 3))
+    cache.get('@', (3, 2, 1))
+    assert cache.stats() == {'hits': 1, 'misses': 3, 'evictions': 0, 'entries': 3, 'bytes': cache.nbytes}
+    assert cache.nbytes == 2 * glyph_bytes(font) + glyph_bytes(font, '#')
+
+
+def test_glyph_color_is_dequantized(font):
+    cache = GlyphCache(font, 8)
+    pixels = pg.surfarray.array3d(cache.get('@', (1, 31, 40))).reshape(-1, 3)
+    assert (8, 248, 255) in set(map(tuple, pixels.tolist()))  # 40 * 8 is clamped to 255
+
+
+def test_evicts_least_recently_used(font):
+    size = glyph_bytes(font)
+    cache = GlyphCache(font, 8, max_bytes=3 * size)
+    a, b, c = (cache.get('@', (i, 0, 0)) for i in range(3))
+    cache.get('@', (0, 0, 0))  # Touch a, so b is now the oldest
+    cache.get('@', (3, 0, 0))
+
+    assert cache.evictions == 1 and len(cache) == 3 and cache.nbytes == 3 * size
+    assert cache.get('@', (0, 0, 0)) is a
+    assert cache.get('@', (2, 0, 0)) is c
+    misses = cache.misses
+    assert cache.get('@', (1, 0, 0)) is not b  # Evicted, so rendered again
+    assert cache.misses == misses + 1
+
+
+def test_keeps_a_glyph_larger_than_the_cap(font):
+    cache = GlyphCache(font, 8, max_bytes=1)
+    cache.get('@', (1, 1, 1))
+    glyph = cache.get('#', (1, 1, 1))
+    assert len(cache) == 1 and cache.evictions == 1
+    assert cache.get('#', (1, 1, 1)) is glyph
@@ -0,0 +1,81 @@
+import pytest
+
+from acsiify import QualityGovernor
+
+
+def feed(governor, milliseconds, count):
+    """Reports `count` frames of the same duration and returns the adjustments they caused."""
+    return [adjustment for adjustment in (governor.update(milliseconds / 1000) for _ in range(count)) if adjustment]
+
+
+def test_ladder_alternates_cells_and_colors():
+    governor = QualityGovernor(10, pixel_size=(6, 8), color_lvl=(8, 32))
+    assert governor.ladder == [(6, 32), (7, 32), (7, 16), (8, 16), (8, 8)]
+    assert (governor.pixel_size, governor.color_lvl) == (6, 32)
+
+
+def test_ladder_with_fixed_bounds():
+    assert QualityGovernor(10, pixel_size=(12, 12), color_lvl=(32, 32)).ladder == [(12, 32)]
+    assert QualityGovernor(10, pixel_size=(6, 9), color_lvl=(16, 16)).ladder == [(6, 16), (7, 16), (8, 16), (9, 16)]
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        QualityGovernor(10, pixel_size=(24, 6))
+    with pytest.raises(ValueError):
+        QualityGovernor(10, color_lvl=(32, 8))
+
+
+def test_steps_down_after_patience_frames_over_budget():
+    governor = QualityGovernor(10, patience=3)
+    assert feed(governor, 20, 2) == []
+    adjustment, = feed(governor, 20, 1)
+    assert adjustment['frame'] == 3
+    assert adjustment['pixel_size'] == (6, 7) and adjustment['color_lvl'] == (32, 32)
+    assert governor.rung == 1 and governor.history == [adjustment]
+
+
+def test_streak_restarts_after_each_step():
+    governor = QualityGovernor(10, patience=3)
+    assert len(feed(governor, 20, 9)) == 3
+    assert governor.rung == 3
+
+
+def test_stops_at_the_last_rung():
+    governor = QualityGovernor(10, pixel_size=(6, 7), color_lvl=(16, 32), patience=1)
+    feed(governor, 50, 20)
+    assert governor.rung == len(governor.ladder) - 1 == 2
+    assert len(governor.history) == 2
+
+
+def test_steps_up_only_after_twice_the_patience_under_the_recovery_threshold():
+    governor = QualityGovernor(10, patience=3, recover=0.7)
+    feed(governor, 20, 6)
+    assert governor.rung == 2
+    assert feed(governor, 5, 5) == []
+    adjustment, = feed(governor, 5, 1)
+    assert adjustment['pixel_size'] == (7, 7) and adjustment['color_lvl'] == (16, 32)
+    assert governor.rung == 1
+
+
+def test_never_steps_above_the_first_rung():
+    governor = QualityGovernor(10, patience=1)
+    assert feed(governor, 1, 20) == []
+    assert governor.rung == 0
+
+
+def test_holds_between_the_thresholds():
+    governor = QualityGovernor(10, patience=2, recover=0.7, smoothing=1.0)
+    feed(governor, 20, 2)
+    assert governor.rung == 1
+    # 8 ms is under the budget but over 0.7 * budget, so nothing changes in either direction
+    assert feed(governor, 8, 50) == []
+    assert governor.rung == 1
+
+
+def test_moving_average_absorbs_single_spikes():
+    governor = QualityGovernor(10, patience=2, smoothing=0.3)
+    assert feed(governor, 5, 10) == []
+    assert governor.update(0.025) is None  # The average rises to 11 ms for one frame
+    assert feed(governor, 5, 20) == []
+    assert governor.rung == 0
@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+
+import acsiify
+
+
+class Recorder(acsiify.Instrumentation):
+    def __init__(self):
+        self.counters = {}
+
+    def on_counter(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+
+def write_clip(path, count=6):
+    rng = np.random.default_rng(0)
+    recorder = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for _ in range(count):
+        recorder.write(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    recorder.release()
+
+
+def test_video_reports_end_of_run_totals(tmp_path):
+    clip = str(tmp_path / 'clip.avi')
+    write_clip(clip)
+    instrumentation = Recorder()
+    converter = acsiify.Asciify(instrumentation=instrumentation)
+
+    converter.video(clip, 8, 8, str(tmp_path / 'out.avi'), pipeline_depth=2)
+    stats = converter.palette.stats()
+    assert instrumentation.counters['glyph_cache_entries'] == stats['entries']
+    assert instrumentation.counters['glyph_cache_bytes'] == stats['bytes']
+    assert instrumentation.counters['glyph_cache_evictions'] == stats['evictions']
+    assert instrumentation.counters['read_queue_full'] == converter.pipeline_stats['read']['full']
+    assert instrumentation.counters['write_queue_empty'] == converter.pipeline_stats['write']['empty']
+
+
+def test_incremental_video_reports_full_frames(tmp_path):
+    clip = str(tmp_path / 'clip.avi')
+    write_clip(clip)
+    instrumentation = Recorder()
+    converter = acsiify.Asciify(instrumentation=instrumentation)
+
+    converter.video(clip, 8, 8, str(tmp_path / 'out.avi'), renderer='atlas', incremental=True)
+    assert instrumentation.counters['incremental_frames'] == 6
+    assert instrumentation.counters['incremental_full_frames'] == converter.palette.full_frames >= 1
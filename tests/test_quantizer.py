@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from acsiify import Quantizer, _color_coeff, _convert_grid
+
+
+@pytest.mark.parametrize('levels', [1, 2, 10, 70, 255])
+def test_char_lut_uses_every_character_in_equal_bands(levels):
+    char_lut = Quantizer(levels, 32).char_lut
+    assert char_lut[0] == 1  # Index 0 is reserved for empty cells
+    assert char_lut[255] == levels
+    assert np.all(np.diff(char_lut.astype(int)) >= 0)
+    counts = np.bincount(char_lut, minlength=levels + 1)[1:]
+    assert counts.min() >= 256 // levels and counts.max() <= -(-256 // levels)
+
+
+@pytest.mark.parametrize('color_lvl', [2, 3, 8, 32, 256])
+def test_color_lut_rounds_to_the_nearest_level(color_lvl):
+    color_lut = Quantizer(10, color_lvl).color_lut
+    coeff = _color_coeff(color_lvl)
+    assert color_lut[0] == 0
+    assert color_lut.max() <= color_lvl - 1
+    assert int(color_lut.max()) * coeff <= 255
+    assert np.all(np.diff(color_lut.astype(int)) >= 0)
+    # Every value decodes to the closest level that fits in 0..255
+    levels = np.arange(int(color_lut.max()) + 1) * coeff
+    nearest = np.abs(np.arange(256)[:, None] - levels[None, :]).min(axis=1)
+    np.testing.assert_array_equal(np.abs(np.arange(256) - color_lut.astype(int) * coeff), nearest)
+
+
+def test_invalid_dither():
+    with pytest.raises(ValueError):
+        Quantizer(10, 32, 'random')
+
+
+@pytest.mark.parametrize('levels', [0, 256])
+def test_char_indices_must_fit_in_uint8(levels):
+    with pytest.raises(ValueError):
+        Quantizer(levels, 32)
+
+
+@pytest.mark.parametrize('dither', [None, 'ordered', 'diffusion'])
+@pytest.mark.parametrize('value', [0, 255])
+def test_extremes_stay_in_range(dither, value):
+    quantizer = Quantizer(10, 8, dither)
+    gray = np.full((8, 8), value, dtype=np.uint8)
+    colors = np.full((8, 8, 3), value, dtype=np.uint8)
+    char_grid, color_grid = quantizer.quantize(gray, colors)
+    assert char_grid.dtype == np.uint8 and color_grid.dtype == np.uint8
+    assert char_grid.shape == (8, 8) and color_grid.shape == (8, 8, 3)
+    np.testing.assert_array_equal(char_grid, quantizer.char_lut[value])
+    np.testing.assert_array_equal(color_grid, quantizer.color_lut[value])
+
+
+@pytest.mark.parametrize('dither', ['ordered', 'diffusion'])
+def test_exact_levels_are_not_dithered(dither):
+    quantizer = Quantizer(10, 8, dither)
+    level = 3 * quantizer.color_coeff
+    color_grid = quantizer.quantize(np.zeros((8, 8), np.uint8), np.full((8, 8, 3), level, dtype=np.uint8))[1]
+    assert np.all(color_grid == 3)
+
+
+@pytest.mark.parametrize('dither', ['ordered', 'diffusion'])
+def test_dithering_keeps_the_mean_of_flat_areas(dither):
+    quantizer = Quantizer(10, 4, dither)
+    coeff = quantizer.color_coeff
+    value = coeff + coeff // 3  # A third of the way between two levels
+    colors = np.full((32, 32, 3), value, dtype=np.uint8)
+    _, plain = Quantizer(10, 4).quantize(np.zeros((32, 32), np.uint8), colors)
+    _, dithered = quantizer.quantize(np.zeros((32, 32), np.uint8), colors)
+    assert len(np.unique(plain)) == 1
+    assert set(np.unique(dithered)) == {1, 2}
+    assert abs(dithered.mean() * coeff - value) < abs(plain.mean() * coeff - value) / 4
+
+
+def test_ordered_dithering_is_aligned_across_tiles():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (40, 56, 3), dtype=np.uint8)
+    gray = rng.integers(0, 256, (40, 56), dtype=np.uint8)
+    quantizer = Quantizer(10, 4, 'ordered')
+    whole_chars, whole_colors = _convert_grid(image, gray, quantizer, 4)
+    # A tile starting at cell (3, 5) quantizes exactly like the same cells of the whole image
+    tile_chars, tile_colors = _convert_grid(image[12:, 20:], gray[12:, 20:], quantizer, 4, origin=(3, 5))
+    np.testing.assert_array_equal(tile_chars, whole_chars[3:, 5:])
+    np.testing.assert_array_equal(tile_colors, whole_colors[3:, 5:])
+
+
+def test_area_average_uses_cell_means():
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    image[:4, :4] = 200  # Top-left cell: its top-left pixel is 200, and so is its mean
+    image[4:, 4:, 0] = [[0, 255, 0, 255]] * 4  # Bottom-right cell: red alternates, mean 127
+    gray = image[..., 0].copy()
+    quantizer = Quantizer(4, 256)
+    char_grid, color_grid = _convert_grid(image, gray, quantizer, 4, area_average=True)
+    assert char_grid[0, 0] == quantizer.char_lut[200]
+    assert color_grid[1, 1, 0] == 127
+    sampled = _convert_grid(image, gray, quantizer, 4)[1]
+    assert sampled[1, 1, 0] == 0
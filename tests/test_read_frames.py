@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+from acsiify import _read_frames
+
+
+class FakeCapture:
+    """Stands in for a cv2.VideoCapture that holds a fixed number of frames."""
+
+    def __init__(self, count):
+        self.frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(count)]
+        self.reads = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        self.reads += 1
+        if self.frames:
+            return True, self.frames.pop(0)
+        return False, None
+
+
+def test_stops_at_end_of_stream():
+    capture = FakeCapture(5)
+    frames = list(_read_frames(capture))
+    assert [int(frame[0, 0, 0]) for frame in frames] == [0, 1, 2, 3, 4]
+    assert capture.reads == 6  # The failed read ends the stream
+
+
+def test_max_frames_stops_without_reading_further():
+    capture = FakeCapture(5)
+    assert len(list(_read_frames(capture, max_frames=3))) == 3
+    assert capture.reads == 3
+
+
+def test_max_frames_beyond_end_of_stream():
+    assert len(list(_read_frames(FakeCapture(2), max_frames=10))) == 2
+
+
+def test_read_times_one_per_frame():
+    read_times = []
+    list(_read_frames(FakeCapture(4), read_times))
+    assert len(read_times) == 4
+
+
+def test_closed_capture_yields_nothing(tmp_path):
+    capture = cv2.VideoCapture(str(tmp_path / 'missing.avi'))
+    assert list(_read_frames(capture)) == []
+
+
+def test_reads_every_frame_of_a_video_file(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    recorder = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (32, 24))
+    for i in range(7):
+        recorder.write(np.full((24, 32, 3), i * 30, dtype=np.uint8))
+    recorder.release()
+
+    capture = cv2.VideoCapture(path)
+    assert len(list(_read_frames(capture))) == 7
+    capture.release()
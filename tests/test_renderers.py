@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import acsiify
+from acsiify import IncrementalCompositor, _create_palette, _render_frame
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return acsiify.Asciify(instrumentation=acsiify.Instrumentation())
+
+
+def random_grids(rows, cols, levels, color_lvl, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, levels + 1, (rows, cols), dtype=np.uint8),
+            rng.integers(0, color_lvl, (rows, cols, 3), dtype=np.uint8))
+
+
+def change(char_grid, color_grid, fraction, levels, color_lvl, seed=1):
+    """Returns copies of the grids with about `fraction` of the cells given a new char and color."""
+    rng = np.random.default_rng(seed)
+    changed = rng.random(char_grid.shape) < fraction
+    new_chars = np.where(changed, (char_grid + 1 + rng.integers(0, levels, char_grid.shape)) % (levels + 1),
+                         char_grid).astype(np.uint8)
+    new_colors = np.where(changed[..., None], (color_grid + 1) % color_lvl, color_grid).astype(np.uint8)
+    return new_chars, new_colors
+
+
+@pytest.mark.parametrize('step', [4, 6, 12, 16])
+def test_atlas_matches_pygame(converter, step):
+    chars = converter.ascii_chars
+    height, width = 10 * step + step // 2, 14 * step + 1  # Partial cells at the bottom and right edge
+    char_grid, color_grid = random_grids(-(-height // step), -(-width // step), len(chars), 16, seed=step)
+    cache, _ = _create_palette(converter.font, chars, 16, 'pygame')
+    atlas, _ = _create_palette(converter.font, chars, 16, 'atlas')
+    expected = _render_frame(char_grid, color_grid, cache, chars, height, width, step)
+    np.testing.assert_array_equal(_render_frame(char_grid, color_grid, atlas, chars, height, width, step), expected)
+
+
+@pytest.mark.parametrize('step', [4, 6, 12, 16])
+@pytest.mark.parametrize('max_dirty', [0.0, 1.0])  # Always compose in full, always patch
+@pytest.mark.parametrize('fraction', [0.0, 0.05, 0.4])
+def test_incremental_matches_full_compose(converter, step, max_dirty, fraction):
+    chars = converter.ascii_chars
+    atlas, _ = _create_palette(converter.font, chars, 16, 'atlas')
+    height, width = 9 * step, 13 * step
+    char_grid, color_grid = random_grids(9, 13, len(chars), 16, seed=step)
+    compositor = IncrementalCompositor(atlas, max_dirty=max_dirty)
+    compositor.compose(char_grid, color_grid, height, width, step)
+
+    for seed in (1, 2, 3):
+        char_grid, color_grid = change(char_grid, color_grid, fraction, len(chars), 16, seed)
+        frame = compositor.compose(char_grid, color_grid, height, width, step)
+        np.testing.assert_array_equal(frame, atlas.compose(char_grid, color_grid, height, width, step))
+
+    assert compositor.frames == 4
+    if fraction and max_dirty == 0.0:
+        assert compositor.full_frames == 4
+    elif max_dirty == 1.0:
+        assert compositor.full_frames == 1
+
+
+def test_incremental_tolerance_keeps_small_color_drift(converter):
+    chars = converter.ascii_chars
+    atlas, _ = _create_palette(converter.font, chars, 16, 'atlas')
+    char_grid, color_grid = random_grids(5, 7, len(chars), 15)
+    compositor = IncrementalCompositor(atlas, tolerance=1)
+    first = compositor.compose(char_grid, color_grid, 60, 84, 12).copy()
+    # A one-level drift stays on screen as it was, a larger change is redrawn
+    np.testing.assert_array_equal(compositor.compose(char_grid, color_grid + 1, 60, 84, 12), first)
+    assert compositor.last_redrawn == 0.0
+    np.testing.assert_array_equal(compositor.compose(char_grid, (color_grid + 3) % 16, 60, 84, 12),
+                                  atlas.compose(char_grid, (color_grid + 3) % 16, 60, 84, 12))
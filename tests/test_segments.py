@@ -0,0 +1,94 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import acsiify
+from acsiify import _read_frames
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """A 30-frame clip at 10 fps, so one-second segments split it in three."""
+    path = str(tmp_path / 'clip.avi')
+    rng = np.random.default_rng(0)
+    recorder = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for _ in range(30):
+        recorder.write(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    recorder.release()
+    return path
+
+
+@pytest.fixture
+def converter():
+    return acsiify.Asciify(instrumentation=acsiify.Instrumentation())
+
+
+def frame_count(path):
+    capture = cv2.VideoCapture(path)
+    count = len(list(_read_frames(capture)))
+    capture.release()
+    return count
+
+
+def test_converts_joins_and_cleans_up(clip, converter, tmp_path):
+    output = str(tmp_path / 'out.avi')
+    result = converter.video_segments(clip, output, segment_seconds=1, pixel_size=8)
+    assert result == {'segments': 3, 'converted': 3, 'skipped': 0, 'missing': [], 'joined': True}
+    assert frame_count(output) == 30
+    assert not os.path.exists(output + '.parts')
+
+
+def test_resumes_from_finished_segments(clip, converter, tmp_path):
+    output, work_dir = str(tmp_path / 'out.avi'), str(tmp_path / 'parts')
+    result = converter.video_segments(clip, output, 1, work_dir, segments=[0, 2], pixel_size=8)
+    assert result == {'segments': 3, 'converted': 2, 'skipped': 0, 'missing': [1], 'joined': False}
+    assert not os.path.exists(output)
+    assert [frame_count(os.path.join(work_dir, f'segment-{i:05d}.avi')) for i in (0, 2)] == [10, 10]
+
+    # An interrupted segment leaves only its temporary file, which is converted again
+    with open(os.path.join(work_dir, 'segment-00001.tmp.avi'), 'wb') as f:
+        f.write(b'partial')
+    finished = os.path.getmtime(os.path.join(work_dir, 'segment-00000.avi'))
+
+    result = converter.video_segments(clip, output, 1, work_dir, pixel_size=8, workers=2, keep_segments=True)
+    assert result == {'segments': 3, 'converted': 1, 'skipped': 2, 'missing': [], 'joined': True}
+    assert os.path.getmtime(os.path.join(work_dir, 'segment-00000.avi')) == finished
+    assert not os.path.exists(os.path.join(work_dir, 'segment-00001.tmp.avi'))
+    assert frame_count(output) == 30
+
+
+def test_join_false_keeps_segments(clip, converter, tmp_path):
+    output, work_dir = str(tmp_path / 'out.avi'), str(tmp_path / 'parts')
+    result = converter.video_segments(clip, output, 1, work_dir, join=False, pixel_size=8)
+    assert result['missing'] == [] and not result['joined']
+    assert sorted(os.listdir(work_dir)) == ['job.json', 'segment-00000.avi', 'segment-00001.avi',
+                                            'segment-00002.avi']
+
+
+def test_refuses_segments_of_another_job(clip, converter, tmp_path):
+    output, work_dir = str(tmp_path / 'out.avi'), str(tmp_path / 'parts')
+    converter.video_segments(clip, output, 1, work_dir, segments=[0], pixel_size=8)
+    with pytest.raises(ValueError, match='different job'):
+        converter.video_segments(clip, output, 1, work_dir, pixel_size=12)
+    with pytest.raises(ValueError, match='different job'):
+        converter.video_segments(clip, output, 2, work_dir, pixel_size=8)
+
+    # Same name and length, different content
+    capture = cv2.VideoCapture(clip)
+    frames = list(_read_frames(capture))
+    capture.release()
+    recorder = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for frame in frames:
+        recorder.write(255 - frame)
+    recorder.release()
+    with pytest.raises(ValueError, match='different job'):
+        converter.video_segments(clip, output, 1, work_dir, pixel_size=8)
+
+
+@pytest.mark.parametrize('options', [{'start': 1}, {'end': 2}, {'governor': acsiify.QualityGovernor(20)}])
+def test_rejects_per_run_options(clip, converter, tmp_path, options):
+    with pytest.raises(ValueError):
+        converter.video_segments(clip, str(tmp_path / 'out.avi'), 1, **options)
+    assert not os.path.exists(str(tmp_path / 'out.avi.parts'))
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+import pytest
+
+import acsiify
+from acsiify import _read_region
+
+
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    """A 360x480 RGB image with smooth gradients, edges and noise, saved as .png and .npy."""
+    directory = tmp_path_factory.mktemp('tiled')
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[:360, :480]
+    image = np.stack([x * 255 // 479, y * 255 // 359, (x + y) % 256], axis=-1).astype(np.int16)
+    image[100:200, 150:330] = 255 - image[100:200, 150:330]
+    image = np.clip(image + rng.integers(-20, 21, image.shape), 0, 255).astype(np.uint8)
+    cv2.imwrite(str(directory / 'source.png'), image[..., ::-1])
+    np.save(directory / 'source.npy', image)
+    return directory, image
+
+
+@pytest.fixture
+def converter():
+    return acsiify.Asciify(instrumentation=acsiify.Instrumentation())
+
+
+def read(path):
+    if path.endswith('.npy'):
+        return np.load(path)[..., ::-1]
+    return cv2.imread(path)
+
+
+@pytest.mark.parametrize('renderer', ['pygame', 'atlas'])
+@pytest.mark.parametrize('source_name,output_name', [
+    ('source.png', 'out.png'),
+    ('source.npy', 'out.npy'),
+    ('source.npy', 'out.ppm'),
+])
+def test_tiled_matches_whole_image(source, converter, tmp_path, renderer, source_name, output_name):
+    directory, _ = source
+    whole_path, tiled_path = str(tmp_path / 'whole.png'), str(tmp_path / output_name)
+    converter.image(str(directory / 'source.png'), 16, 8, whole_path, renderer=renderer)
+    converter.image(str(directory / source_name), 16, 8, tiled_path, renderer=renderer, tile_size=100)
+    np.testing.assert_array_equal(read(tiled_path), read(whole_path))
+
+
+@pytest.mark.parametrize('geometry', ['240x180', '300x200', '960x720'])
+def test_tiled_matches_whole_image_with_geometry(source, converter, tmp_path, geometry):
+    directory, _ = source
+    converter.image(str(directory / 'source.png'), 16, 8, str(tmp_path / 'whole.png'), geometry, 'atlas')
+    converter.image(str(directory / 'source.npy'), 16, 8, str(tmp_path / 'tiled.png'), geometry, 'atlas',
+                    tile_size=96)
+    np.testing.assert_array_equal(read(str(tmp_path / 'tiled.png')), read(str(tmp_path / 'whole.png')))
+
+
+@pytest.mark.parametrize('size', [(480, 360), (240, 180), (300, 200), (600, 450), (160, 300), (500, 390)])
+def test_read_region_matches_whole_resize(source, size):
+    _, image = source
+    width, height = size
+    expected = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    expected_gray = cv2.resize(cv2.cvtColor(image, cv2.COLOR_RGB2GRAY), size, interpolation=cv2.INTER_AREA)
+    for y0 in range(0, height, 64):
+        for x0 in range(0, width, 80):
+            y1, x1 = min(y0 + 64, height), min(x0 + 80, width)
+            region, gray_region = _read_region(image, y0, y1, x0, x1, size, 64)
+            np.testing.assert_array_equal(region, expected[y0:y1, x0:x1])
+            np.testing.assert_array_equal(gray_region, expected_gray[y0:y1, x0:x1])
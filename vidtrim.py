@@ -1,92 +1,260 @@
-import customtkinter as ctk
-from CTkMessagebox import CTkMessagebox
-import tkinter as tk
-import cv2
-import os
-
-
-class VideoTrimmer:
-    def __init__(self, master):
-        self.master = master
-        master.title("Video Trimmer")
-
-        # --- Input fields ---
-        ctk.CTkLabel(master, text="Input Video File:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        self.input_file_entry = ctk.CTkEntry(master)
-        self.input_file_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
-        ctk.CTkButton(master, text="Browse", command=self.browse_input_file).grid(row=0, column=2, padx=5, pady=5)
-
-        ctk.CTkLabel(master, text="Start Time (seconds):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        self.start_time_entry = ctk.CTkEntry(master)
-        self.start_time_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
-
-        ctk.CTkLabel(master, text="End Time (seconds):").grid(row=2, column=0, padx=5, pady=5, sticky="w")
-        self.end_time_entry = ctk.CTkEntry(master)
-        self.end_time_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
-
-        ctk.CTkLabel(master, text="Output Video File:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
-        self.output_file_entry = ctk.CTkEntry(master)
-        self.output_file_entry.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
-        ctk.CTkButton(master, text="Browse", command=self.browse_output_file).grid(row=3, column=2, padx=5, pady=5)
-
-        # --- Trim Button ---
-        ctk.CTkButton(master, text="Trim Video", command=self.trim_video).grid(row=4, column=1, padx=5, pady=10)
-
-        # --- Configure grid weights ---
-        master.grid_columnconfigure(1, weight=1)
-
-
-    def browse_input_file(self):
-        file_path = tk.filedialog.askopenfilename(initialdir=os.getcwd(), title="Select Input Video", 
-                                                filetypes=(("Video Files", "*.mp4;*.avi;*.mkv"), ("All Files", "*.*")))
-        self.input_file_entry.delete(0, tk.END)
-        self.input_file_entry.insert(0, file_path)
-
-    def browse_output_file(self):
-        file_path = tk.filedialog.asksaveasfilename(initialdir=os.getcwd(), title="Select Output Video",
-                                                 defaultextension=".mp4", filetypes=(("MP4 Files", "*.mp4"), ("All Files", "*.*")))
-        self.output_file_entry.delete(0, tk.END)
-        self.output_file_entry.insert(0, file_path)
-
-    def trim_video(self):
-        input_file = self.input_file_entry.get()
-        start_time = float(self.start_time_entry.get())
-        end_time = float(self.end_time_entry.get())
-        output_file = self.output_file_entry.get()
-
-        if not input_file or not start_time or not end_time or not output_file:
-            CTkMessagebox(title="Error", message="Please fill in all fields.", icon="cancel")
-            return
-
-        cap = cv2.VideoCapture(input_file)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        start_frame = int(start_time * fps)
-        end_frame = int(end_time * fps)
-
-        if start_frame < 0 or start_frame >= frame_count or end_frame < 0 or end_frame >= frame_count or start_frame >= end_frame:
-            CTkMessagebox(title="Error", message="Invalid start or end time.", icon="cancel")
-            return
-
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_file, fourcc, fps, (int(cap.get(3)), int(cap.get(4))))
-
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-
-        while cap.isOpened() and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) < end_frame:
-            ret, frame = cap.read()
-            if ret:
-                out.write(frame)
-            else:
-                break
-
-        cap.release()
-        out.release()
-
-        CTkMessagebox(message="CTkMessagebox is successfully installed.",
-                  icon="check", option_1="Thanks")
-
-root = ctk.CTk()
-app = VideoTrimmer(root)
-root.mainloop() 
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import cv2
+
+try:
+    import customtkinter as ctk
+    from CTkMessagebox import CTkMessagebox
+    import tkinter as tk
+    from tkinter import filedialog
+except ImportError:  # The trimming engine also works without the GUI packages
+    ctk = None
+
+
+def probe(input_file):
+    """Returns the frame rate, frame count, width and height of a video file."""
+    cap = cv2.VideoCapture(input_file)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open {input_file}")
+    info = {
+        'fps': cap.get(cv2.CAP_PROP_FPS) or 30,
+        'frame_count': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    }
+    cap.release()
+    return info
+
+
+def frame_range(fps, frame_count, start_time=0, end_time=None):
+    """Turns start and end times in seconds into a [start_frame, end_frame) range, clamped to the video."""
+    start_frame = max(0, round(start_time * fps))
+    end_frame = frame_count if end_time is None else min(frame_count, round(end_time * fps))
+    if start_frame >= end_frame:
+        raise ValueError("Invalid start or end time.")
+    return start_frame, end_frame
+
+
+def _fourcc(output_file):
+    """Picks a codec OpenCV can write into the container of the output file."""
+    return cv2.VideoWriter_fourcc(*('XVID' if output_file.lower().endswith('.avi') else 'mp4v'))
+
+
+def _ffmpeg():
+    """Returns the path to ffmpeg, or None when it is not installed."""
+    return shutil.which('ffmpeg')
+
+
+def trim(input_file, output_file, start_time=0, end_time=None, stream_copy=True):
+    """
+    Cuts the [start_time, end_time) range of a video into a new file.
+
+    With stream_copy and ffmpeg on the PATH, packets are copied without decoding,
+    so the cut starts at the last keyframe at or before start_time. Otherwise
+    OpenCV seeks to that keyframe, decodes forward to the exact start frame and
+    re-encodes only the frames of the range.
+
+    Args:
+        input_file (str): The path to the input video file.
+        output_file (str): The path to the output video file.
+        start_time (float, optional): Start of the range in seconds. Defaults to 0.
+        end_time (float, optional): End of the range in seconds. Defaults to None (the end of the video).
+        stream_copy (bool, optional): Copy packets with ffmpeg when it is available. Defaults to True.
+
+    Returns:
+        int or None: The number of frames written when re-encoding, or None when
+        packets were copied, since the copy also holds the frames between the
+        keyframe and start_time.
+    """
+
+    info = probe(input_file)
+    start_frame, end_frame = frame_range(info['fps'], info['frame_count'], start_time, end_time)
+
+    ffmpeg = _ffmpeg() if stream_copy else None
+    if ffmpeg:
+        # -ss before -i seeks on the demuxer, so nothing before the keyframe is read
+        command = [ffmpeg, '-y', '-loglevel', 'error', '-ss', str(start_frame / info['fps']), '-i', input_file,
+                   '-t', str((end_frame - start_frame) / info['fps']), '-c', 'copy',
+                   '-avoid_negative_ts', 'make_zero', output_file]
+        subprocess.run(command, check=True)
+        return None
+
+    cap = cv2.VideoCapture(input_file)
+    out = cv2.VideoWriter(output_file, _fourcc(output_file), info['fps'], (info['width'], info['height']))
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    # Count frames instead of asking the capture for its position on every read
+    written = 0
+    while written < end_frame - start_frame:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        out.write(frame)
+        written += 1
+
+    cap.release()
+    out.release()
+    return written
+
+
+def split(input_file, output_dir, segment_time, stream_copy=True):
+    """
+    Splits a video into consecutive segments of about segment_time seconds.
+
+    With stream_copy and ffmpeg on the PATH, the video is cut at the first
+    keyframe after every boundary without decoding. Otherwise the video is
+    decoded once and re-encoded into segments of exactly segment_time seconds.
+
+    Args:
+        input_file (str): The path to the input video file.
+        output_dir (str): Directory for the segments, named <input name>_000<ext>, <input name>_001<ext>, ...
+        segment_time (float): Length of a segment in seconds.
+        stream_copy (bool, optional): Copy packets with ffmpeg when it is available. Defaults to True.
+
+    Returns:
+        list: The paths to the segments, in order.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    base, ext = os.path.splitext(os.path.basename(input_file))
+    pattern = os.path.join(output_dir, f"{base}_%03d{ext}")
+
+    ffmpeg = _ffmpeg() if stream_copy else None
+    if ffmpeg:
+        # ffmpeg lists the segments it wrote, so files left by an earlier split are never picked up
+        fd, list_path = tempfile.mkstemp(suffix='.txt', dir=output_dir)
+        os.close(fd)
+        try:
+            command = [ffmpeg, '-y', '-loglevel', 'error', '-i', input_file, '-map', '0', '-c', 'copy',
+                       '-f', 'segment', '-segment_time', str(segment_time), '-reset_timestamps', '1',
+                       '-segment_list', list_path, '-segment_list_type', 'flat', pattern]
+            subprocess.run(command, check=True)
+            with open(list_path) as f:
+                return [os.path.join(output_dir, os.path.basename(line.strip())) for line in f if line.strip()]
+        finally:
+            os.remove(list_path)
+
+    info = probe(input_file)
+    frames_per_segment = max(1, round(segment_time * info['fps']))
+    cap = cv2.VideoCapture(input_file)
+    paths = []
+    out = None
+    written = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if written % frames_per_segment == 0:
+            if out is not None:
+                out.release()
+            paths.append(pattern % len(paths))
+            out = cv2.VideoWriter(paths[-1], _fourcc(paths[-1]), info['fps'], (info['width'], info['height']))
+        out.write(frame)
+        written += 1
+
+    cap.release()
+    if out is not None:
+        out.release()
+    return paths
+
+
+class VideoTrimmer:
+    def __init__(self, master):
+        self.master = master
+        master.title("Video Trimmer")
+
+        # --- Input fields ---
+        ctk.CTkLabel(master, text="Input Video File:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.input_file_entry = ctk.CTkEntry(master)
+        self.input_file_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        ctk.CTkButton(master, text="Browse", command=self.browse_input_file).grid(row=0, column=2, padx=5, pady=5)
+
+        ctk.CTkLabel(master, text="Start Time (seconds):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.start_time_entry = ctk.CTkEntry(master)
+        self.start_time_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+        ctk.CTkLabel(master, text="End Time (seconds):").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.end_time_entry = ctk.CTkEntry(master)
+        self.end_time_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+
+        ctk.CTkLabel(master, text="Output Video File:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        self.output_file_entry = ctk.CTkEntry(master)
+        self.output_file_entry.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
+        ctk.CTkButton(master, text="Browse", command=self.browse_output_file).grid(row=3, column=2, padx=5, pady=5)
+
+        # --- Trim Button ---
+        ctk.CTkButton(master, text="Trim Video", command=self.trim_video).grid(row=4, column=1, padx=5, pady=10)
+
+        # --- Configure grid weights ---
+        master.grid_columnconfigure(1, weight=1)
+
+
+    def browse_input_file(self):
+        file_path = filedialog.askopenfilename(initialdir=os.getcwd(), title="Select Input Video",
+                                               filetypes=(("Video Files", "*.mp4;*.avi;*.mkv"), ("All Files", "*.*")))
+        self.input_file_entry.delete(0, tk.END)
+        self.input_file_entry.insert(0, file_path)
+
+    def browse_output_file(self):
+        file_path = filedialog.asksaveasfilename(initialdir=os.getcwd(), title="Select Output Video",
+                                                 defaultextension=".mp4", filetypes=(("MP4 Files", "*.mp4"), ("All Files", "*.*")))
+        self.output_file_entry.delete(0, tk.END)
+        self.output_file_entry.insert(0, file_path)
+
+    def trim_video(self):
+        input_file = self.input_file_entry.get()
+        output_file = self.output_file_entry.get()
+
+        if not input_file or not self.start_time_entry.get() or not self.end_time_entry.get() or not output_file:
+            CTkMessagebox(title="Error", message="Please fill in all fields.", icon="cancel")
+            return
+
+        try:
+            trim(input_file, output_file, float(self.start_time_entry.get()), float(self.end_time_entry.get()))
+        except (ValueError, subprocess.CalledProcessError) as error:
+            CTkMessagebox(title="Error", message=str(error), icon="cancel")
+            return
+
+        CTkMessagebox(message="Video trimmed successfully.", icon="check", option_1="Thanks")
+
+
+def main(argv=None):
+    """Trims or splits a video from the command line, or opens the GUI when no input is given."""
+    parser = argparse.ArgumentParser(description='Trim or split videos at keyframes.')
+    parser.add_argument('input', nargs='?', help='The input video file (default: open the GUI).')
+    parser.add_argument('output', nargs='?', help='The output video file, or the output directory with --split.')
+    parser.add_argument('--start', type=float, default=0, help='Start time in seconds.')
+    parser.add_argument('--end', type=float, help='End time in seconds (default: the end of the video).')
+    parser.add_argument('--split', type=float, metavar='SECONDS', help='Split into segments of this length.')
+    parser.add_argument('--reencode', action='store_true', help='Decode and re-encode instead of copying packets.')
+    args = parser.parse_args(argv)
+
+    if args.input is None:
+        if ctk is None:
+            parser.error("the GUI needs customtkinter and CTkMessagebox; pass an input and output to run headless")
+        root = ctk.CTk()
+        VideoTrimmer(root)
+        root.mainloop()
+        return
+
+    if args.output is None:
+        parser.error("an output path is required")
+    if args.split:
+        for path in split(args.input, args.output, args.split, stream_copy=not args.reencode):
+            print(path)
+    else:
+        frames = trim(args.input, args.output, args.start, args.end, stream_copy=not args.reencode)
+        if frames is None:
+            print(f"Copied from the keyframe at or before {args.start}s to {args.output}")
+        else:
+            print(f"Re-encoded {frames} frames to {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())